@@ -5,11 +5,20 @@ import logging
 import argparse
 import json
 import time
+from collections import defaultdict, deque
 from datetime import datetime
+from functools import lru_cache, reduce
+from operator import xor
 from bleak import BleakClient, BleakScanner
 from bleak.exc import BleakError
 import csv
 import os
+import random
+import re
+import signal
+import struct
+import sys
+import threading
 
 # Configure logging
 logging.basicConfig(
@@ -22,6 +31,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger("MarstekBLE")
 
+# libuv-based event loop if installed (not available on Windows)
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Compact one-line JSON for monitoring samples (orjson if installed)
+try:
+    import orjson
+
+    def _dumps_line(obj):
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+except ImportError:
+    def _dumps_line(obj):
+        return (json.dumps(obj, separators=(',', ':')) + '\n').encode('utf-8')
+
 class MarstekB2500:
     """Client for Marstek B2500 Battery System"""
 
@@ -45,28 +70,65 @@ class MarstekB2500:
     CMD_REBOOT_DEVICE = 0x25
     CMD_FACTORY_SETTINGS = 0x26
     
+    # Keys for the 14 battery cells, shared by every cell data decode
+    _CELL_KEYS = tuple(f"cell{i}" for i in range(1, 15))
+    
+    # Timer response layout: 3x (enabled, start h/m, end h/m, power) + adaptive
+    # (enabled, power, meter, time); newer firmware appends timers 4 & 5 at byte 43
+    _TIMER_STRUCT = struct.Struct('<5BH5BH5BHB3H')
+    _EXTRA_TIMER_STRUCT = struct.Struct('<5BH5BH')
+    
+    # Device info payload: type=<5>,id=<24>,mac=<12>[,version=<5+>]
+    _DEVINFO_RE = re.compile(
+        rb'type=(?P<type>[^,]*),id=(?P<id>[^,]*),mac=(?P<mac>[^,]*)'
+        rb'(?:,.*?version=(?P<version>.*))?',
+        re.DOTALL
+    )
+    
     def __init__(self, address=None):
         self.address = address
         self.client = None
         self.connected = False
+        self._write_char = self.WRITE_CHAR_UUID
+        self._notify_char = self.READ_NOTIFY_CHAR_UUID
+        self._write_response = True
         self.device_info = {}
+        self._device_info_cache = None
         self.runtime_data = {}
         self.cell_data = {}
         self.timer_data = {}
-        self.notification_callbacks = {}
+        # Pending response futures per command code, resolved in FIFO order
+        self.notification_callbacks = defaultdict(deque)
+        self._iso_cache = (0, "")
+        
+        # Response decoders keyed by command code
+        self._decoders = {
+            self.CMD_RUNTIME_INFO: self._decode_runtime_info,
+            self.CMD_DEVICE_INFO: self._decode_device_info,
+            self.CMD_CELL_VOLTAGES: self._decode_cell_voltages,
+            self.CMD_GET_TIMERS: self._decode_timer_info
+        }
 
-    async def scan_for_devices(self):
-        """Scan for nearby Marstek devices"""
+    async def scan_for_devices(self, timeout=5.0):
+        """Scan for nearby Marstek devices, stopping at the first match"""
         logger.info("Scanning for Marstek devices...")
-        devices = await BleakScanner.discover()
-        marstek_devices = []
+        marstek_devices = {}
+        found = asyncio.Event()
+        
+        def detection_callback(device, advertisement_data):
+            name = advertisement_data.local_name or device.name
+            if name and ("Marstek" in name or "B2500" in name) and device.address not in marstek_devices:
+                marstek_devices[device.address] = {"name": name, "address": device.address}
+                logger.info(f"Found Marstek device: {name} ({device.address})")
+                found.set()
         
-        for device in devices:
-            if device.name and ("Marstek" in device.name or "B2500" in device.name):
-                marstek_devices.append({"name": device.name, "address": device.address})
-                logger.info(f"Found Marstek device: {device.name} ({device.address})")
+        async with BleakScanner(detection_callback=detection_callback):
+            try:
+                await asyncio.wait_for(found.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
         
-        return marstek_devices
+        return list(marstek_devices.values())
     
     async def connect(self, address=None):
         """Connect to the Marstek device"""
@@ -76,33 +138,35 @@ class MarstekB2500:
         if not self.address:
             raise ValueError("No device address provided")
         
+        # Device identity is only cached for the lifetime of a connection
+        self._device_info_cache = None
+        
         try:
             logger.info(f"Connecting to {self.address}...")
             self.client = BleakClient(self.address)
             await self.client.connect()
             self.connected = True
             logger.info(f"Connected to {self.address}")
+            self._resolve_characteristics()
             
             # Set up notification handler
             await self.client.start_notify(
-                self.READ_NOTIFY_CHAR_UUID, 
+                self._notify_char, 
                 self._notification_handler
             )
             
             # Send a dummy command to initialize the connection
             # Use a shorter timeout since we expect this might fail
             logger.info("Sending initialization command...")
+            init_ok = False
             try:
-                dummy_future = asyncio.Future()
-                self.notification_callbacks[self.CMD_DEVICE_INFO] = dummy_future
+                dummy_future = self._add_waiter(self.CMD_DEVICE_INFO)
                 
-                await self.client.write_gatt_char(
-                    self.WRITE_CHAR_UUID, 
-                    self._create_command(self.CMD_DEVICE_INFO)
-                )
+                await self._write(self._create_command(self.CMD_DEVICE_INFO))
                 
                 # Wait with a shorter timeout
                 await asyncio.wait_for(dummy_future, timeout=0.2)
+                init_ok = True
                 logger.info("Initialization command succeeded")
             except asyncio.TimeoutError:
                 logger.info("Initialization command timed out (expected)")
@@ -110,48 +174,102 @@ class MarstekB2500:
                 logger.info(f"Initialization command failed: {e} (continuing anyway)")
             finally:
                 # Clean up the callback
-                if self.CMD_DEVICE_INFO in self.notification_callbacks:
-                    del self.notification_callbacks[self.CMD_DEVICE_INFO]
+                self._remove_waiter(self.CMD_DEVICE_INFO, dummy_future)
                 
-                # Small delay to let the device settle
-                await asyncio.sleep(1.0)
+                # Small delay to let the device settle, unless it already answered
+                if not init_ok:
+                    await asyncio.sleep(0.3)
                 
             return True
-        except BleakError as e:
-            logger.error(f"Connection error: {e}")
+        except (BleakError, asyncio.TimeoutError) as e:
+            logger.error(f"Connection error: {e!r}")
             self.connected = False
+            
+            # Drop a half-open link so a retry doesn't open a second client next to it
+            try:
+                await self.client.disconnect()
+            except Exception:
+                pass
             return False
     
     async def disconnect(self):
         """Disconnect from the device"""
         if self.client and self.connected:
             try:
-                await self.client.stop_notify(self.READ_NOTIFY_CHAR_UUID)
+                await self.client.stop_notify(self._notify_char)
                 await self.client.disconnect()
                 self.connected = False
                 logger.info(f"Disconnected from {self.address}")
             except BleakError as e:
                 logger.error(f"Disconnection error: {e}")
     
+    def _resolve_characteristics(self):
+        """Look up the GATT characteristics once so writes skip UUID resolution"""
+        service = self.client.services.get_service(self.SERVICE_UUID)
+        write_char = service.get_characteristic(self.WRITE_CHAR_UUID) if service else None
+        notify_char = service.get_characteristic(self.READ_NOTIFY_CHAR_UUID) if service else None
+        
+        # Fall back to the UUID strings if the service table doesn't list them
+        self._write_char = write_char or self.WRITE_CHAR_UUID
+        self._notify_char = notify_char or self.READ_NOTIFY_CHAR_UUID
+        
+        # Write-Without-Response saves a GATT round-trip per command when supported
+        self._write_response = not (
+            write_char and "write-without-response" in write_char.properties
+        )
+    
+    async def _write(self, packet):
+        """Write a packet to the command characteristic"""
+        await self.client.write_gatt_char(
+            self._write_char, packet, response=self._write_response
+        )
+    
+    def _add_waiter(self, cmd):
+        """Queue a future to be resolved by the next response to cmd"""
+        future = asyncio.get_running_loop().create_future()
+        self.notification_callbacks[cmd].append(future)
+        return future
+    
+    def _remove_waiter(self, cmd, future):
+        """Drop a future that is no longer waiting for a response"""
+        waiters = self.notification_callbacks.get(cmd)
+        if waiters and future in waiters:
+            waiters.remove(future)
+    
+    def _timestamp(self):
+        """Current time as ISO string, cached to 1-second granularity"""
+        now = int(time.time())
+        if now != self._iso_cache[0]:
+            self._iso_cache = (now, datetime.fromtimestamp(now).isoformat())
+        return self._iso_cache[1]
+    
     def _create_command(self, cmd, data=b'\x01'):
         """Create a command packet with proper header and checksum"""
+        # Normalize to bytes so the packet cache can key on it
         if isinstance(data, int):
             data = bytes([data])
+        data = bytes(data)
         
-        # Build command packet
-        packet = bytearray([0x73, 0x00, 0x23, cmd])
-        packet.extend(data)
-        
-        # Set length (packet length + 1 for checksum byte)
-        packet[1] = len(packet) + 1
-        
-        # Calculate CRC (XOR of all bytes)
-        crc = 0
-        for b in packet:
-            crc ^= b
+        # Only polled single-byte payloads are cached; longer ones (WiFi
+        # credentials etc.) must not linger in memory
+        if len(data) == 1:
+            return self._make_cached_packet(cmd, data)
+        return self._make_packet(cmd, data)
+    
+    @staticmethod
+    def _make_packet(cmd, data):
+        """Build a packet from a command byte and payload"""
+        # Header, length (packet length + 1 for checksum byte), control, command
+        packet = bytes((0x73, 5 + len(data), 0x23, cmd)) + data
         
-        packet.append(crc)
-        return packet
+        # Append CRC (XOR of all bytes)
+        return packet + bytes((reduce(xor, packet, 0),))
+    
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _make_cached_packet(cmd, data):
+        """Build a packet; polled commands reuse the cached bytes"""
+        return MarstekB2500._make_packet(cmd, data)
     
     async def _send_command(self, cmd, data=b'\x01', wait_for_response=True):
         """Send a command to the device and wait for response"""
@@ -161,29 +279,27 @@ class MarstekB2500:
         
         try:
             packet = self._create_command(cmd, data)
-            logger.debug(f"Sending command: {packet.hex()}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Sending command: {packet.hex()}")
             
             # Register callback for this specific command if waiting for response
-            if wait_for_response:
-                response_future = asyncio.Future()
-                self.notification_callbacks[cmd] = response_future
-            
-            await self.client.write_gatt_char(self.WRITE_CHAR_UUID, packet)
+            response_future = self._add_waiter(cmd) if wait_for_response else None
             
-            # Wait for response if needed
-            if wait_for_response:
-                try:
+            try:
+                await self._write(packet)
+                
+                # Wait for response if needed
+                if response_future:
                     # Wait for response with a longer timeout for cell data (5 seconds)
                     timeout = 5.0 if cmd == self.CMD_CELL_VOLTAGES else 3.0
-                    response = await asyncio.wait_for(response_future, timeout=timeout)
-                    return response
-                except asyncio.TimeoutError:
-                    logger.warning(f"No response received for command 0x{cmd:02x}")
-                    return None
-                finally:
-                    # Clean up callback
-                    if cmd in self.notification_callbacks:
-                        del self.notification_callbacks[cmd]
+                    return await asyncio.wait_for(response_future, timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"No response received for command 0x{cmd:02x}")
+                return None
+            finally:
+                # Clean up callback
+                if response_future:
+                    self._remove_waiter(cmd, response_future)
             
             return True
         except BleakError as e:
@@ -192,7 +308,10 @@ class MarstekB2500:
     
     def _notification_handler(self, sender, data):
         """Handle notifications from the device"""
-        logger.debug(f"Notification from {sender}: {data.hex()}")
+        # Only format hex dumps when debug logging is actually on
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug(f"Notification from {sender}: {data.hex()}")
         
         if len(data) < 4:
             logger.warning(f"Received too short notification: {data.hex()}")
@@ -200,25 +319,23 @@ class MarstekB2500:
         
         # Extract command code from response
         cmd = data[3]
-        logger.debug(f"Received response for command: 0x{cmd:02x}")
+        if debug:
+            logger.debug(f"Received response for command: 0x{cmd:02x}")
         
         # Process the response based on command type
-        if cmd == self.CMD_RUNTIME_INFO:
-            self._decode_runtime_info(data)
-        elif cmd == self.CMD_DEVICE_INFO:
-            self._decode_device_info(data)
-        elif cmd == self.CMD_CELL_VOLTAGES:
-            self._decode_cell_voltages(data)
-        elif cmd == self.CMD_GET_TIMERS:
-            self._decode_timer_info(data)
+        decoder = self._decoders.get(cmd)
+        if decoder:
+            decoder(data)
         else:
             logger.debug(f"Unhandled notification for command 0x{cmd:02x}")
         
-        # Check if we have a pending future for this command
-        if cmd in self.notification_callbacks:
-            future = self.notification_callbacks[cmd]
+        # Resolve the oldest pending future for this command
+        waiters = self.notification_callbacks.get(cmd)
+        while waiters:
+            future = waiters.popleft()
             if not future.done():
                 future.set_result(data)
+                break
     
     def _decode_runtime_info(self, data):
         """Decode runtime information response"""
@@ -252,7 +369,7 @@ class MarstekB2500:
         
         # Store the decoded data
         self.runtime_data = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": self._timestamp(),
             "pv1": {
                 "active": pv1_state > 0,
                 "transparent": pv1_state == 2,
@@ -299,30 +416,20 @@ class MarstekB2500:
     
     def _decode_device_info(self, data):
         """Decode device information response"""
-        # Convert binary data to string and parse the fields
-        data_str = data.decode('utf-8', errors='ignore')
-        
-        # Parse device type, ID, MAC from the response
+        # Parse device type, ID, MAC from the response in a single scan,
+        # decoding only the matched fields
         try:
-            if 'type=' in data_str and 'id=' in data_str and 'mac=' in data_str:
-                type_start = data_str.find('type=') + 5
-                type_end = data_str.find(',', type_start)
-                device_type = data_str[type_start:type_end]
-                
-                id_start = data_str.find('id=') + 3
-                id_end = data_str.find(',', id_start)
-                device_id = data_str[id_start:id_end]
-                
-                mac_start = data_str.find('mac=') + 4
-                mac_end = data_str.find(',', mac_start) if ',' in data_str[mac_start:] else len(data_str)
-                mac = data_str[mac_start:mac_end]
+            match = self._DEVINFO_RE.search(data)
+            if match:
+                device_type, device_id, mac = (
+                    match.group(name).decode('utf-8', errors='ignore')
+                    for name in ('type', 'id', 'mac')
+                )
                 
                 # Check for firmware version in newer devices
                 firmware_version = "Unknown"
-                if 'version=' in data_str:
-                    ver_start = data_str.find('version=') + 8
-                    ver_end = len(data_str)
-                    firmware_version = data_str[ver_start:ver_end].strip()
+                if match.group('version') is not None:
+                    firmware_version = match.group('version').decode('utf-8', errors='ignore').strip()
                 
                 self.device_info = {
                     "type": device_type,
@@ -336,71 +443,75 @@ class MarstekB2500:
         except Exception as e:
             logger.error(f"Error parsing device info: {e}")
     
+    def _store_cell_data(self, soc, temp1, temp2, raw):
+        """Store cell data from raw millivolt readings"""
+        # min/max/sum run over the small ints; convert to volts once at the end
+        count = len(raw)
+        raw_min = min(raw)
+        raw_max = max(raw)
+        raw_sum = sum(raw)
+        cell_min = raw_min / 1000
+        cell_max = raw_max / 1000
+        
+        self.cell_data = {
+            "timestamp": self._timestamp(),
+            "soc": soc,
+            "temperatures": {
+                "temp1": temp1,
+                "temp2": temp2
+            },
+            "cells": dict(zip(self._CELL_KEYS, (v / 1000 for v in raw))),
+            "summary": {
+                "min": cell_min,
+                "max": cell_max,
+                "avg": raw_sum / (count * 1000),
+                "diff": (raw_max - raw_min) / 1000,
+                "sum": raw_sum / 1000,
+                "count": count
+            }
+        }
+        
+        logger.info(f"Cell data updated: SOC={soc}%, "
+                   f"Min={cell_min:.3f}V, Max={cell_max:.3f}V, "
+                   f"Diff={(cell_max-cell_min):.3f}V, "
+                   f"Temps={temp1}°C/{temp2}°C")
+    
     def _decode_cell_voltages(self, data):
         """Decode cell voltages and temperature response"""
-        logger.debug(f"Decoding cell data: {data.hex()}")
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug(f"Decoding cell data: {data.hex()}")
         
         # Some devices return the data as a string format
-        try:
-            # The cell data might be a string with underscore separators after position 4
-            data_str = data[4:].decode('utf-8', errors='ignore')
-            logger.debug(f"Cell data as string: {data_str}")
-            
-            # Format should be: SOC_TEMP1_TEMP2_CELL1_CELL2_...
-            parts = data_str.split('_')
-            
-            if len(parts) >= 17:  # Expected: SOC + 2 temps + 14 cells
-                soc = int(parts[0])
-                temp1 = int(parts[1])
-                temp2 = int(parts[2])
-                
-                cell_voltages = []
-                cell_sum = 0
-                cell_min = float('inf')
-                cell_max = 0
+        # (SOC_TEMP1_TEMP2_CELL1_..._CELL14); only attempt it if the payload
+        # has enough '_' separators, so binary packets skip the decode entirely
+        if data.count(b'_', 4) >= 16:
+            try:
+                # The cell data might be a string with underscore separators after position 4
+                data_str = data[4:].decode('utf-8', errors='ignore')
+                if debug:
+                    logger.debug(f"Cell data as string: {data_str}")
                 
-                for i in range(3, 17):
-                    if parts[i]:  # Make sure we have valid data
-                        voltage = float(parts[i]) / 1000  # Convert to volts
-                        cell_voltages.append(voltage)
-                        cell_sum += voltage
-                        cell_min = min(cell_min, voltage)
-                        cell_max = max(cell_max, voltage)
+                # Format should be: SOC_TEMP1_TEMP2_CELL1_CELL2_...
+                parts = data_str.split('_')
                 
-                if cell_voltages:
-                    avg_voltage = cell_sum / len(cell_voltages)
+                if len(parts) >= 17:  # Expected: SOC + 2 temps + 14 cells
+                    soc = int(parts[0])
+                    temp1 = int(parts[1])
+                    temp2 = int(parts[2])
                     
-                    self.cell_data = {
-                        "timestamp": datetime.now().isoformat(),
-                        "soc": soc,
-                        "temperatures": {
-                            "temp1": temp1,
-                            "temp2": temp2
-                        },
-                        "cells": {
-                            f"cell{i+1}": cell_voltages[i] for i in range(len(cell_voltages))
-                        },
-                        "summary": {
-                            "min": cell_min,
-                            "max": cell_max,
-                            "avg": avg_voltage,
-                            "diff": cell_max - cell_min,
-                            "sum": cell_sum,
-                            "count": len(cell_voltages)
-                        }
-                    }
+                    # Cell voltages in millivolts, skipping empty fields
+                    raw = tuple(map(int, filter(None, parts[3:17])))
                     
-                    logger.info(f"Cell data updated: SOC={soc}%, "
-                              f"Min={cell_min:.3f}V, Max={cell_max:.3f}V, "
-                              f"Diff={(cell_max-cell_min):.3f}V, "
-                              f"Temps={temp1}°C/{temp2}°C")
-                    return True
+                    if raw:
+                        self._store_cell_data(soc, temp1, temp2, raw)
+                        return True
+                
+                # If we're here, the string format parsing failed or returned insufficient data
+                logger.debug("String format parsing failed or returned insufficient data")
             
-            # If we're here, the string format parsing failed or returned insufficient data
-            logger.debug("String format parsing failed or returned insufficient data")
-        
-        except Exception as e:
-            logger.debug(f"String parsing error: {e}")
+            except Exception as e:
+                logger.debug(f"String parsing error: {e}")
         
         # Try binary format as fallback (newer firmware might use binary format)
         try:
@@ -416,47 +527,12 @@ class MarstekB2500:
             temp1 = data[5]
             temp2 = data[6]
             
-            cell_voltages = []
-            cell_sum = 0
-            cell_min = float('inf')
-            cell_max = 0
-            
-            # Parse each cell (2 bytes per cell, little-endian)
-            for i in range(7, min(35, len(data)), 2):
-                if i+1 < len(data):
-                    voltage = int.from_bytes(data[i:i+2], byteorder='little') / 1000
-                    cell_voltages.append(voltage)
-                    cell_sum += voltage
-                    cell_min = min(cell_min, voltage)
-                    cell_max = max(cell_max, voltage)
+            # Parse up to 14 cells in one go (2 bytes per cell, little-endian, mV)
+            count = (min(35, len(data)) - 7) // 2
+            raw = struct.unpack_from(f'<{count}H', data, 7)
             
-            if cell_voltages:
-                avg_voltage = cell_sum / len(cell_voltages)
-                
-                self.cell_data = {
-                    "timestamp": datetime.now().isoformat(),
-                    "soc": soc,
-                    "temperatures": {
-                        "temp1": temp1,
-                        "temp2": temp2
-                    },
-                    "cells": {
-                        f"cell{i+1}": cell_voltages[i] for i in range(len(cell_voltages))
-                    },
-                    "summary": {
-                        "min": cell_min,
-                        "max": cell_max,
-                        "avg": avg_voltage,
-                        "diff": cell_max - cell_min,
-                        "sum": cell_sum,
-                        "count": len(cell_voltages)
-                    }
-                }
-                
-                logger.info(f"Cell data updated: SOC={soc}%, "
-                          f"Min={cell_min:.3f}V, Max={cell_max:.3f}V, "
-                          f"Diff={(cell_max-cell_min):.3f}V, "
-                          f"Temps={temp1}°C/{temp2}°C")
+            if raw:
+                self._store_cell_data(soc, temp1, temp2, raw)
                 return True
         
         except Exception as e:
@@ -464,7 +540,8 @@ class MarstekB2500:
         
         # If we got here, both parsing methods failed
         logger.error("Failed to parse cell data in any format")
-        logger.debug(f"Raw cell data: {data.hex()}")
+        if debug:
+            logger.debug(f"Raw cell data: {data.hex()}")
         return False
 
     async def get_cell_voltages(self):
@@ -481,9 +558,18 @@ class MarstekB2500:
             await asyncio.sleep(1.0)  # Wait a moment before retrying
             response = await self._send_command(self.CMD_CELL_VOLTAGES, 0x01)
         
-        await asyncio.sleep(0.5)  # Give a moment for notification processing
         return self.cell_data
     
+    @staticmethod
+    def _timer_entry(enabled, start_hour, start_min, end_hour, end_min, power):
+        """Build a timer dict from its unpacked fields"""
+        return {
+            "enabled": enabled == 1,
+            "start_time": f"{start_hour:02d}:{start_min:02d}",
+            "end_time": f"{end_hour:02d}:{end_min:02d}",
+            "power": power
+        }
+    
     def _decode_timer_info(self, data):
         """Decode timer information response"""
         if len(data) < 33:  # Minimum length check
@@ -491,88 +577,20 @@ class MarstekB2500:
             return
         
         try:
-            # Extract timer settings
-            timer1_enabled = data[5] == 1
-            timer1_start_hour = data[6]
-            timer1_start_min = data[7]
-            timer1_end_hour = data[8]
-            timer1_end_min = data[9]
-            timer1_power = int.from_bytes(data[10:12], byteorder='little')
-            
-            timer2_enabled = data[12] == 1
-            timer2_start_hour = data[13]
-            timer2_start_min = data[14]
-            timer2_end_hour = data[15]
-            timer2_end_min = data[16]
-            timer2_power = int.from_bytes(data[17:19], byteorder='little')
-            
-            timer3_enabled = data[19] == 1
-            timer3_start_hour = data[20]
-            timer3_start_min = data[21]
-            timer3_end_hour = data[22]
-            timer3_end_min = data[23]
-            timer3_power = int.from_bytes(data[24:26], byteorder='little')
-            
-            adaptive_enabled = data[26] == 1
-            adaptive_power = int.from_bytes(data[27:29], byteorder='little')
-            adaptive_meter = int.from_bytes(data[29:31], byteorder='little')
-            adaptive_time = int.from_bytes(data[31:33], byteorder='little')
-            
-            # Check for timer 4 & 5 in newer firmware
-            timer4_enabled = False
-            timer5_enabled = False
-            timer4_data = {}
-            timer5_data = {}
-            
-            if len(data) >= 57:  # New firmware with 5 timers
-                timer4_enabled = data[43] == 1
-                timer4_start_hour = data[44]
-                timer4_start_min = data[45]
-                timer4_end_hour = data[46]
-                timer4_end_min = data[47]
-                timer4_power = int.from_bytes(data[48:50], byteorder='little')
-                
-                timer5_enabled = data[50] == 1
-                timer5_start_hour = data[51]
-                timer5_start_min = data[52]
-                timer5_end_hour = data[53]
-                timer5_end_min = data[54]
-                timer5_power = int.from_bytes(data[55:57], byteorder='little')
-                
-                timer4_data = {
-                    "enabled": timer4_enabled,
-                    "start_time": f"{timer4_start_hour:02d}:{timer4_start_min:02d}",
-                    "end_time": f"{timer4_end_hour:02d}:{timer4_end_min:02d}",
-                    "power": timer4_power
-                }
-                
-                timer5_data = {
-                    "enabled": timer5_enabled,
-                    "start_time": f"{timer5_start_hour:02d}:{timer5_start_min:02d}",
-                    "end_time": f"{timer5_end_hour:02d}:{timer5_end_min:02d}",
-                    "power": timer5_power
-                }
+            # Extract timer settings: timers 1-3 (enabled, start h/m, end h/m,
+            # power) followed by the adaptive mode block, starting at byte 5
+            fields = self._TIMER_STRUCT.unpack_from(data, 5)
+            timer1, timer2, timer3 = (
+                self._timer_entry(*fields[i:i + 6]) for i in (0, 6, 12)
+            )
+            adaptive_enabled = fields[18] == 1
+            adaptive_power, adaptive_meter, adaptive_time = fields[19:22]
             
             self.timer_data = {
-                "timestamp": datetime.now().isoformat(),
-                "timer1": {
-                    "enabled": timer1_enabled,
-                    "start_time": f"{timer1_start_hour:02d}:{timer1_start_min:02d}",
-                    "end_time": f"{timer1_end_hour:02d}:{timer1_end_min:02d}",
-                    "power": timer1_power
-                },
-                "timer2": {
-                    "enabled": timer2_enabled,
-                    "start_time": f"{timer2_start_hour:02d}:{timer2_start_min:02d}",
-                    "end_time": f"{timer2_end_hour:02d}:{timer2_end_min:02d}",
-                    "power": timer2_power
-                },
-                "timer3": {
-                    "enabled": timer3_enabled,
-                    "start_time": f"{timer3_start_hour:02d}:{timer3_start_min:02d}",
-                    "end_time": f"{timer3_end_hour:02d}:{timer3_end_min:02d}",
-                    "power": timer3_power
-                },
+                "timestamp": self._timestamp(),
+                "timer1": timer1,
+                "timer2": timer2,
+                "timer3": timer3,
                 "adaptive": {
                     "enabled": adaptive_enabled,
                     "power": adaptive_power,
@@ -581,36 +599,41 @@ class MarstekB2500:
                 }
             }
             
-            if timer4_data:
-                self.timer_data["timer4"] = timer4_data
-            
-            if timer5_data:
-                self.timer_data["timer5"] = timer5_data
+            # Check for timer 4 & 5 in newer firmware
+            if len(data) >= 57:  # New firmware with 5 timers
+                fields = self._EXTRA_TIMER_STRUCT.unpack_from(data, 43)
+                self.timer_data["timer4"] = self._timer_entry(*fields[:6])
+                self.timer_data["timer5"] = self._timer_entry(*fields[6:])
             
-            logger.info(f"Timer settings updated: Timer1={timer1_enabled}, Timer2={timer2_enabled}, "
-                       f"Timer3={timer3_enabled}, Adaptive={adaptive_enabled}")
+            logger.info(f"Timer settings updated: Timer1={timer1['enabled']}, Timer2={timer2['enabled']}, "
+                       f"Timer3={timer3['enabled']}, Adaptive={adaptive_enabled}")
             
         except Exception as e:
             logger.error(f"Error parsing timer data: {e}")
 
     # High-level API methods
     
-    async def get_device_info(self):
-        """Get device information"""
+    async def get_device_info(self, refresh=False):
+        """Get device information (static, so cached once known)"""
+        if self._device_info_cache and not refresh:
+            return self._device_info_cache
+        
+        # The notification handler decodes before resolving the response future
         await self._send_command(self.CMD_DEVICE_INFO)
-        await asyncio.sleep(1)  # Wait for notification to be processed
+        if self.device_info:
+            self._device_info_cache = self.device_info
         return self.device_info
     
     async def get_runtime_info(self):
         """Get runtime information"""
+        # The notification handler decodes before resolving the response future
         await self._send_command(self.CMD_RUNTIME_INFO)
-        await asyncio.sleep(1)  # Wait for notification to be processed
         return self.runtime_data
     
     async def get_timer_settings(self):
         """Get timer settings"""
+        # The notification handler decodes before resolving the response future
         await self._send_command(self.CMD_GET_TIMERS)
-        await asyncio.sleep(1)  # Wait for notification to be processed
         return self.timer_data
     
     async def set_dod(self, dod_value):
@@ -664,11 +687,28 @@ class MarstekB2500:
         start_time = time.time()
         iteration = 0
         
-        # Set up data storage
-        runtime_data = []
-        cell_data = []
+        # Set up data storage (samples are streamed to JSON Lines files, with
+        # one CSV row of cell voltages per sample for easy analysis)
+        runtime_file = None
+        cell_file = None
+        csv_file = None
+        csv_writer = None
+        write_task = None
         
         try:
+            if save_data:
+                os.makedirs("data", exist_ok=True)
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                runtime_file = open(f"data/runtime_{timestamp}.jsonl", 'ab', buffering=1 << 16)
+                cell_file = open(f"data/cell_{timestamp}.jsonl", 'ab', buffering=1 << 16)
+                # Append like the JSONL files so a same-second restart can't truncate them
+                csv_file = open(f"data/cells_{timestamp}.csv", 'a', newline='', buffering=1 << 16)
+                csv_writer = csv.writer(csv_file)
+                if csv_file.tell() == 0:
+                    csv_writer.writerow(('timestamp',) + self._CELL_KEYS)
+                logger.info(f"Saving monitoring data to {runtime_file.name}, "
+                            f"{cell_file.name} and {csv_file.name}")
+            
             while True:
                 iteration += 1
                 current_time = time.time()
@@ -681,21 +721,22 @@ class MarstekB2500:
                 
                 logger.info(f"Monitoring iteration {iteration}")
                 
-                # Get runtime data
-                await self.get_runtime_info()
-                if self.runtime_data:
-                    if save_data:
-                        runtime_data.append(self.runtime_data)
-                
-                # Get cell voltage data
-                await self.get_cell_voltages()
-                if self.cell_data:
-                    if save_data:
-                        cell_data.append(self.cell_data)
+                # Get runtime and cell voltage data; responses are matched by
+                # command code, so both requests can be in flight at once
+                await asyncio.gather(self.get_runtime_info(), self.get_cell_voltages())
                 
-                # Save data periodically (every 10 iterations)
-                if save_data and iteration % 10 == 0:
-                    self._save_monitoring_data(runtime_data, cell_data)
+                # Write the sample off the event loop so notifications keep being
+                # serviced; shielded so cancelling never closes a file mid-write
+                if save_data:
+                    write_task = asyncio.ensure_future(asyncio.to_thread(
+                        self._record_sample, runtime_file, cell_file, csv_file, csv_writer,
+                        self.runtime_data, self.cell_data
+                    ))
+                    try:
+                        await asyncio.shield(write_task)
+                    except OSError as e:
+                        # A failed write (disk full, flaky SD card) shouldn't stop polling
+                        logger.error(f"Error saving monitoring data: {e}")
                 
                 # Wait for next iteration
                 await asyncio.sleep(interval)
@@ -705,68 +746,307 @@ class MarstekB2500:
         except Exception as e:
             logger.error(f"Error during monitoring: {e}")
         finally:
-            # Save final data
-            if save_data:
-                self._save_monitoring_data(runtime_data, cell_data)
-    
-    def _save_monitoring_data(self, runtime_data, cell_data):
-        """Save monitoring data to files"""
-        try:
-            # Ensure directory exists
-            os.makedirs("data", exist_ok=True)
-            
-            # Generate timestamp for filenames
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            
-            # Save runtime data
-            if runtime_data:
-                runtime_file = f"data/runtime_{timestamp}.json"
-                with open(runtime_file, 'w') as f:
-                    json.dump(runtime_data, f, indent=2)
-                logger.info(f"Saved runtime data to {runtime_file}")
-            
-            # Save cell data
-            if cell_data:
-                cell_file = f"data/cell_{timestamp}.json"
-                with open(cell_file, 'w') as f:
-                    json.dump(cell_data, f, indent=2)
-                logger.info(f"Saved cell data to {cell_file}")
+            if write_task:
+                await asyncio.gather(write_task, return_exceptions=True)
             
-            # Also save latest cell data as CSV for easy analysis
-            if cell_data:
-                latest = cell_data[-1]
-                csv_file = "data/latest_cell_data.csv"
-                
-                with open(csv_file, 'w', newline='') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(['Cell', 'Voltage (V)'])
-                    for i in range(14):
-                        cell_key = f"cell{i+1}"
-                        if cell_key in latest["cells"]:
-                            writer.writerow([cell_key, latest["cells"][cell_key]])
-                    
-                    writer.writerow([])
-                    writer.writerow(['Parameter', 'Value'])
-                    writer.writerow(['Min Voltage', latest["summary"]["min"]])
-                    writer.writerow(['Max Voltage', latest["summary"]["max"]])
-                    writer.writerow(['Avg Voltage', latest["summary"]["avg"]])
-                    writer.writerow(['Voltage Diff', latest["summary"]["diff"]])
-                    writer.writerow(['Total Voltage', latest["summary"]["sum"]])
-                    writer.writerow(['Temp 1 (°C)', latest["temperatures"]["temp1"]])
-                    writer.writerow(['Temp 2 (°C)', latest["temperatures"]["temp2"]])
-                    writer.writerow(['SOC (%)', latest["soc"]])
-                
-                logger.info(f"Saved latest cell data as CSV to {csv_file}")
+            for f in (runtime_file, cell_file, csv_file):
+                if f:
+                    f.close()
+    
+    def _record_sample(self, runtime_file, cell_file, csv_file, csv_writer,
+                       runtime_data, cell_data):
+        """Append one monitoring sample to the session files"""
+        if runtime_data:
+            self._append_sample(runtime_file, runtime_data)
         
+        if cell_data:
+            self._append_sample(cell_file, cell_data)
+            cells = cell_data["cells"]
+            csv_writer.writerow([cell_data["timestamp"]] +
+                                [cells.get(key) for key in self._CELL_KEYS])
+            # The CSV stays open for the whole session; flush so every row is on disk
+            csv_file.flush()
+    
+    @staticmethod
+    def _append_sample(f, sample):
+        """Append one sample as a JSON line and flush it to disk"""
+        f.write(_dumps_line(sample))
+        f.flush()
+
+
+async def ainput(prompt=""):
+    """Read a line from stdin without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    
+    def resolve(result, error):
+        if not future.done():
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+    
+    def read_line():
+        try:
+            line = input(prompt)
         except Exception as e:
-            logger.error(f"Error saving monitoring data: {e}")
+            loop.call_soon_threadsafe(resolve, None, e)
+        else:
+            loop.call_soon_threadsafe(resolve, line, None)
+    
+    # A daemon thread (rather than the default executor) so a prompt that is
+    # still waiting for input never holds up interpreter shutdown
+    threading.Thread(target=read_line, daemon=True).start()
+    return await future
+
+
+async def run_monitoring(marstek, duration, interval):
+    """Monitor until done or Ctrl+C, keeping the session and connection alive"""
+    loop = asyncio.get_running_loop()
+    monitoring_task = asyncio.create_task(
+        marstek.monitor_continuous(
+            interval=interval,
+            save_data=True,
+            duration=duration
+        )
+    )
+    interrupted = False
+    
+    def on_sigint():
+        nonlocal interrupted
+        interrupted = True
+        monitoring_task.cancel()
+    
+    # Route Ctrl+C to the monitoring task only (not supported on Windows loops)
+    previous_handler = signal.getsignal(signal.SIGINT)
+    try:
+        loop.add_signal_handler(signal.SIGINT, on_sigint)
+        handler_installed = True
+    except (NotImplementedError, RuntimeError):
+        handler_installed = False
+    
+    try:
+        await asyncio.shield(monitoring_task)
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        interrupted = True
+        monitoring_task.cancel()
+        await asyncio.gather(monitoring_task, return_exceptions=True)
+    finally:
+        if handler_installed:
+            loop.remove_signal_handler(signal.SIGINT)
+            if previous_handler is not None:
+                signal.signal(signal.SIGINT, previous_handler)
+    
+    return not interrupted
+
+
+async def connect_with_retry(marstek, address=None, attempts=5, base_delay=0.5):
+    """Connect, retrying transient BLE failures with exponential backoff and jitter"""
+    for attempt in range(attempts):
+        if await marstek.connect(address):
+            return True
+        
+        if attempt < attempts - 1:
+            delay = base_delay * 2 ** attempt + random.random() * base_delay
+            logger.info(f"Connection attempt {attempt + 1}/{attempts} failed, retrying in {delay:.1f}s...")
+            await asyncio.sleep(delay)
+    
+    return False
+
+
+# Shared pretty-printer for command output
+_PRETTY_JSON = json.JSONEncoder(indent=2)
+
+
+def print_json(obj):
+    """Stream obj to stdout as indented JSON without building the full string"""
+    sys.stdout.writelines(_PRETTY_JSON.iterencode(obj))
+    sys.stdout.write('\n')
+
+
+# Interactive command handlers take the raw argument text; each docstring
+# doubles as its help line
+
+async def cmd_info(marstek, arg_text):
+    """info [--refresh] - Get device information (--refresh re-queries the device)"""
+    info = await marstek.get_device_info(refresh='--refresh' in arg_text.split())
+    print("\nDevice Information:")
+    print_json(info)
+
+
+async def cmd_status(marstek, arg_text):
+    """status - Get current status"""
+    status = await marstek.get_runtime_info()
+    print("\nDevice Status:")
+    print_json(status)
+
+
+async def cmd_cells(marstek, arg_text):
+    """cells - Get cell voltages"""
+    cells = await marstek.get_cell_voltages()
+    print("\nCell Voltages:")
+    print_json(cells)
+
+
+async def cmd_timers(marstek, arg_text):
+    """timers - Get timer settings"""
+    timers = await marstek.get_timer_settings()
+    print("\nTimer Settings:")
+    print_json(timers)
+
+
+async def cmd_set_dod(marstek, arg_text):
+    """set_dod <value> - Set DOD (10-100)"""
+    try:
+        dod = int(arg_text.split()[0])
+    except (ValueError, IndexError):
+        print("Invalid DOD value. Usage: set_dod <value>")
+        return
+    
+    if await marstek.set_dod(dod):
+        print(f"DOD set to {dod}%")
+    else:
+        print("Failed to set DOD")
+
+
+async def cmd_reboot(marstek, arg_text):
+    """reboot - Reboot the device"""
+    confirm = await ainput("Are you sure you want to reboot the device? (y/n): ")
+    if confirm.lower() == 'y':
+        if await marstek.reboot_device():
+            print("Reboot command sent")
+        else:
+            print("Failed to send reboot command")
+
+
+async def cmd_factory_reset(marstek, arg_text):
+    """factory_reset - Reset to factory settings"""
+    confirm = await ainput("Are you sure you want to factory reset the device? (y/n): ")
+    if confirm.lower() == 'y':
+        if await marstek.factory_reset():
+            print("Factory reset command sent")
+        else:
+            print("Failed to send factory reset command")
+
+
+async def cmd_set_region(marstek, arg_text):
+    """set_region <0|1|2> - Set region (0=EU, 1=China, 2=Non-EU)"""
+    try:
+        region = int(arg_text.split()[0])
+    except (ValueError, IndexError):
+        print("Invalid region value. Usage: set_region <0|1|2>")
+        return
+    
+    if await marstek.set_region(region):
+        print(f"Region set to {region}")
+    else:
+        print("Failed to set region")
+
+
+async def cmd_set_wifi(marstek, arg_text):
+    """set_wifi <ssid> <password> - Set WiFi configuration"""
+    # Split off the SSID only, so the password keeps its spacing exactly as typed
+    parts = arg_text.split(maxsplit=1)
+    if len(parts) < 2:
+        print("Invalid command. Usage: set_wifi <ssid> <password>")
+        return
+    
+    ssid, password = parts
+    if await marstek.set_wifi_config(ssid, password):
+        print(f"WiFi configuration set for SSID: {ssid}")
+    else:
+        print("Failed to set WiFi configuration")
+
+
+async def cmd_adaptive(marstek, arg_text):
+    """adaptive <on|off> - Enable/disable adaptive mode"""
+    args = arg_text.split()
+    mode = args[0].lower() if args else None
+    if mode not in ('on', 'off'):
+        print("Invalid mode. Usage: adaptive <on|off>")
+        return
+    
+    enable = mode == 'on'
+    if await marstek.enable_adaptive_mode(enable):
+        print(f"Adaptive mode {'enabled' if enable else 'disabled'}")
+    else:
+        print(f"Failed to {'enable' if enable else 'disable'} adaptive mode")
+
+
+async def cmd_monitor(marstek, arg_text):
+    """monitor <seconds> [interval] - Monitor the device for specified duration"""
+    args = arg_text.split()
+    try:
+        duration = int(args[0])
+        interval = int(args[1]) if len(args) > 1 else 60
+    except (ValueError, IndexError):
+        print("Invalid parameters. Usage: monitor <seconds> [interval]")
+        return
+    
+    print(f"Starting monitoring for {duration} seconds with {interval}s interval...")
+    print("Press Ctrl+C to stop")
+    
+    if await run_monitoring(marstek, duration, interval):
+        print("Monitoring completed")
+    else:
+        print("Monitoring cancelled by user")
+
+
+INTERACTIVE_COMMANDS = {
+    'info': cmd_info,
+    'status': cmd_status,
+    'cells': cmd_cells,
+    'timers': cmd_timers,
+    'set_dod': cmd_set_dod,
+    'reboot': cmd_reboot,
+    'factory_reset': cmd_factory_reset,
+    'set_region': cmd_set_region,
+    'set_wifi': cmd_set_wifi,
+    'adaptive': cmd_adaptive,
+    'monitor': cmd_monitor
+}
+
+
+LAST_ADDRESS_FILE = os.path.expanduser("~/.marstek_last_addr")
+
+
+def load_last_address():
+    """Return the last successfully connected device address, if any"""
+    try:
+        with open(LAST_ADDRESS_FILE) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def save_last_address(address):
+    """Remember the device address for the next interactive session"""
+    try:
+        with open(LAST_ADDRESS_FILE, 'w') as f:
+            f.write(f"{address}\n")
+    except OSError as e:
+        logger.warning(f"Could not save last device address: {e}")
 
 
 async def interactive_session(address=None):
     """Run an interactive session with the Marstek device"""
     marstek = MarstekB2500(address)
     
-    # If no address provided, scan for devices
+    # If no address provided, ask for one (offering the last used device)
+    # and only scan when the user doesn't give one
+    if not address:
+        last_address = load_last_address()
+        if last_address:
+            prompt = f"\nDevice address (Enter for {last_address}, 'scan' to scan): "
+        else:
+            prompt = "\nDevice address (blank to scan): "
+        
+        choice = (await ainput(prompt)).strip()
+        if choice and choice.lower() != 'scan':
+            address = choice
+        elif last_address and not choice:
+            address = last_address
+    
     if not address:
         devices = await marstek.scan_for_devices()
         if not devices:
@@ -777,7 +1057,7 @@ async def interactive_session(address=None):
         for i, device in enumerate(devices):
             print(f"{i+1}. {device['name']} - {device['address']}")
         
-        choice = input("\nSelect device number (or enter address manually): ")
+        choice = await ainput("\nSelect device number (or enter address manually): ")
         try:
             idx = int(choice) - 1
             if 0 <= idx < len(devices):
@@ -788,166 +1068,69 @@ async def interactive_session(address=None):
             address = choice.strip()
     
     # Connect to the device
-    if not await marstek.connect(address):
+    if not await connect_with_retry(marstek, address):
         logger.error("Failed to connect to device")
         return
     
+    save_last_address(address)
+    
     try:
         print("\n=== Marstek B2500 Interactive Console ===")
         print("Type 'help' for available commands")
         
+        # Resolve per-command lookups once instead of on every iteration
+        get_handler = INTERACTIVE_COMMANDS.get
+        help_text = "\n".join(
+            ["\nAvailable commands:"] +
+            [f"  {handler.__doc__}" for handler in INTERACTIVE_COMMANDS.values()] +
+            ["  exit/quit - Exit"]
+        )
+        
         while True:
-            command = input("\nCommand: ").strip().lower()
+            line = (await ainput("\nCommand: ")).strip()
+            if not line:
+                continue
+            
+            # Only the verb is case-insensitive; the arguments (e.g. WiFi
+            # credentials) are handed over exactly as typed
+            verb, *rest = line.split(maxsplit=1)
+            verb = verb.lower()
+            arg_text = rest[0] if rest else ''
             
-            if command == 'quit' or command == 'exit':
+            if verb == 'quit' or verb == 'exit':
                 print("Exiting...")
                 break
             
-            elif command == 'help':
-                print("\nAvailable commands:")
-                print("  info - Get device information")
-                print("  status - Get current status")
-                print("  cells - Get cell voltages")
-                print("  timers - Get timer settings")
-                print("  set_dod <value> - Set DOD (10-100)")
-                print("  reboot - Reboot the device")
-                print("  factory_reset - Reset to factory settings")
-                print("  set_region <0|1|2> - Set region (0=EU, 1=China, 2=Non-EU)")
-                print("  set_wifi <ssid> <password> - Set WiFi configuration")
-                print("  adaptive <on|off> - Enable/disable adaptive mode")
-                print("  monitor <seconds> [interval] - Monitor the device for specified duration")
-                print("  exit/quit - Exit")
-            
-            elif command == 'info':
-                info = await marstek.get_device_info()
-                print("\nDevice Information:")
-                print(json.dumps(info, indent=2))
-            
-            elif command == 'status':
-                status = await marstek.get_runtime_info()
-                print("\nDevice Status:")
-                print(json.dumps(status, indent=2))
-            
-            elif command == 'cells':
-                cells = await marstek.get_cell_voltages()
-                print("\nCell Voltages:")
-                print(json.dumps(cells, indent=2))
-            
-            elif command == 'timers':
-                timers = await marstek.get_timer_settings()
-                print("\nTimer Settings:")
-                print(json.dumps(timers, indent=2))
-            
-            elif command.startswith('set_dod '):
-                try:
-                    dod = int(command.split()[1])
-                    if await marstek.set_dod(dod):
-                        print(f"DOD set to {dod}%")
-                    else:
-                        print("Failed to set DOD")
-                except (ValueError, IndexError):
-                    print("Invalid DOD value. Usage: set_dod <value>")
-            
-            elif command == 'reboot':
-                confirm = input("Are you sure you want to reboot the device? (y/n): ")
-                if confirm.lower() == 'y':
-                    if await marstek.reboot_device():
-                        print("Reboot command sent")
-                    else:
-                        print("Failed to send reboot command")
-            
-            elif command == 'factory_reset':
-                confirm = input("Are you sure you want to factory reset the device? (y/n): ")
-                if confirm.lower() == 'y':
-                    if await marstek.factory_reset():
-                        print("Factory reset command sent")
-                    else:
-                        print("Failed to send factory reset command")
+            elif verb == 'help':
+                print(help_text)
             
-            elif command.startswith('set_region '):
-                try:
-                    region = int(command.split()[1])
-                    if await marstek.set_region(region):
-                        print(f"Region set to {region}")
-                    else:
-                        print("Failed to set region")
-                except (ValueError, IndexError):
-                    print("Invalid region value. Usage: set_region <0|1|2>")
-            
-            elif command.startswith('set_wifi '):
-                parts = command.split(' ', 2)
-                if len(parts) < 3:
-                    print("Invalid command. Usage: set_wifi <ssid> <password>")
-                    continue
-                
-                ssid = parts[1]
-                password = parts[2]
-                if await marstek.set_wifi_config(ssid, password):
-                    print(f"WiFi configuration set for SSID: {ssid}")
-                else:
-                    print("Failed to set WiFi configuration")
-            
-            elif command.startswith('adaptive '):
-                try:
-                    mode = command.split()[1].lower()
-                    if mode == 'on':
-                        if await marstek.enable_adaptive_mode(True):
-                            print("Adaptive mode enabled")
-                        else:
-                            print("Failed to enable adaptive mode")
-                    elif mode == 'off':
-                        if await marstek.enable_adaptive_mode(False):
-                            print("Adaptive mode disabled")
-                        else:
-                            print("Failed to disable adaptive mode")
-                    else:
-                        print("Invalid mode. Usage: adaptive <on|off>")
-                except IndexError:
-                    print("Invalid command. Usage: adaptive <on|off>")
-            
-            elif command.startswith('monitor '):
-                parts = command.split()
-                try:
-                    if len(parts) >= 2:
-                        duration = int(parts[1])
-                        interval = int(parts[2]) if len(parts) > 2 else 60
-                        
-                        print(f"Starting monitoring for {duration} seconds with {interval}s interval...")
-                        print("Press Ctrl+C to stop")
-                        
-                        # Start monitoring task
-                        monitoring_task = asyncio.create_task(
-                            marstek.monitor_continuous(
-                                interval=interval,
-                                save_data=True,
-                                duration=duration
-                            )
-                        )
-                        
-                        # Wait for completion
-                        await monitoring_task
-                        print("Monitoring completed")
-                    else:
-                        print("Invalid command. Usage: monitor <seconds> [interval]")
-                except (ValueError, IndexError):
-                    print("Invalid parameters. Usage: monitor <seconds> [interval]")
-                except KeyboardInterrupt:
-                    print("Monitoring cancelled by user")
+            elif (handler := get_handler(verb)):
+                await handler(marstek, arg_text)
             
             else:
-                print(f"Unknown command: {command}")
+                print(f"Unknown command: {verb}")
                 print("Type 'help' for available commands")
     
-    except KeyboardInterrupt:
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        # Ctrl+C while awaiting a prompt cancels the task instead of raising
         print("\nSession terminated by user")
     finally:
         await marstek.disconnect()
 
+# Read-only queries available in command mode
+CLI_QUERIES = {
+    "info": MarstekB2500.get_device_info,
+    "status": MarstekB2500.get_runtime_info,
+    "cells": MarstekB2500.get_cell_voltages,
+    "timers": MarstekB2500.get_timer_settings
+}
+
+
 async def main():
     parser = argparse.ArgumentParser(description="Marstek B2500 BLE Client")
     parser.add_argument("--address", help="MAC address of the Marstek device")
-    parser.add_argument("--command", choices=["info", "status", "cells", "timers", "monitor"], 
-                      help="Command to execute")
+    parser.add_argument("--command", nargs="+", choices=[*CLI_QUERIES, "monitor"], 
+                      help="Command(s) to execute over a single connection")
     parser.add_argument("--monitor-time", type=int, default=3600, 
                       help="Duration of monitoring in seconds (default: 3600)")
     parser.add_argument("--interval", type=int, default=60, 
@@ -960,27 +1143,20 @@ async def main():
         marstek = MarstekB2500(args.address)
         
         # Connect to the device
-        if not await marstek.connect():
+        if not await connect_with_retry(marstek):
             return
         
         try:
-            if args.command == "info":
-                info = await marstek.get_device_info()
-                print(json.dumps(info, indent=2))
-            
-            elif args.command == "status":
-                status = await marstek.get_runtime_info()
-                print(json.dumps(status, indent=2))
-            
-            elif args.command == "cells":
-                cells = await marstek.get_cell_voltages()
-                print(json.dumps(cells, indent=2))
-            
-            elif args.command == "timers":
-                timers = await marstek.get_timer_settings()
-                print(json.dumps(timers, indent=2))
+            # Issue all queries concurrently; responses are matched per command code
+            queries = [c for c in dict.fromkeys(args.command) if c in CLI_QUERIES]
+            if queries:
+                results = await asyncio.gather(*(CLI_QUERIES[c](marstek) for c in queries))
+                if len(queries) == 1:
+                    print_json(results[0])
+                else:
+                    print_json(dict(zip(queries, results)))
             
-            elif args.command == "monitor":
+            if "monitor" in args.command:
                 print(f"Monitoring for {args.monitor_time} seconds with {args.interval}s interval...")
                 await marstek.monitor_continuous(
                     interval=args.interval,
@@ -997,5 +1173,8 @@ async def main():
         await interactive_session(args.address)
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
 